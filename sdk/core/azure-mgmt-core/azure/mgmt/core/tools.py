@@ -23,22 +23,57 @@
 # IN THE SOFTWARE.
 #
 # --------------------------------------------------------------------------
-from typing import Mapping, MutableMapping, Optional, Type, Union, cast
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, MutableMapping, NamedTuple, Optional, Tuple, Type, Union, cast
 import re
+import sys
 import logging
 
 
 _LOGGER = logging.getLogger(__name__)
 _ARMID_RE = re.compile(
-    "(?i)/subscriptions/(?P<subscription>[^/]+)(/resourceGroups/(?P<resource_group>[^/]+))?"
-    + "(/providers/(?P<namespace>[^/]+)/(?P<type>[^/]*)/(?P<name>[^/]+)(?P<children>.*))?"
+    "/subscriptions/(?P<subscription>[^/]+)(/resourceGroups/(?P<resource_group>[^/]+))?"
+    + "(/providers/(?P<namespace>[^/]+)/(?P<type>[^/]*)/(?P<name>[^/]+)(?P<children>.*))?",
+    re.IGNORECASE,
+)
+
+# Same as _ARMID_RE without the children, for use with fullmatch on ids that have none
+_ARMID_ROOT_RE = re.compile(
+    "/subscriptions/(?P<subscription>[^/]+)(/resourceGroups/(?P<resource_group>[^/]+))?"
+    + "(/providers/(?P<namespace>[^/]+)/(?P<type>[^/]*)/(?P<name>[^/]+))?",
+    re.IGNORECASE,
 )
 
 _CHILDREN_RE = re.compile(
-    "(?i)(/providers/(?P<child_namespace>[^/]+))?/" + "(?P<child_type>[^/]*)/(?P<child_name>[^/]+)"
+    "(/providers/(?P<child_namespace>[^/]+))?/" + "(?P<child_type>[^/]*)/(?P<child_name>[^/]+)",
+    re.IGNORECASE,
 )
 
-_ARMNAME_RE = re.compile("^[^<>%&:\\?/]{1,260}$")
+_ARMNAME_FORBIDDEN = frozenset("<>%&:?/")
+
+# (child_namespace_{level}, child_type_{level}, child_name_{level}, child_parent_{level}) keys, indexed by level
+_CHILD_KEYS = tuple(
+    (
+        sys.intern("child_namespace_%d" % level),
+        sys.intern("child_type_%d" % level),
+        sys.intern("child_name_%d" % level),
+        sys.intern("child_parent_%d" % level),
+    )
+    for level in range(32)
+)
+
+
+class _ResourceIdParts(NamedTuple):
+    """The segments of a parsed resource id, with child resources kept as (namespace, type, name)."""
+
+    subscription: str
+    resource_group: Optional[str] = None
+    namespace: Optional[str] = None
+    type: Optional[str] = None
+    name: Optional[str] = None
+    remainder: Optional[str] = None
+    children: Tuple[Tuple[Optional[str], str, str], ...] = ()
 
 
 __all__ = [
@@ -78,18 +113,144 @@ def parse_resource_id(rid: str) -> Mapping[str, Union[str, int]]:
     """
     if not rid:
         return {}
-    match = _ARMID_RE.match(rid)
+    return dict(_parse_resource_id_cached(rid))
+
+
+@lru_cache(maxsize=1024)
+def _parse_resource_id_cached(rid: str) -> Mapping[str, Union[str, int]]:
+    """Parses a non-empty resource_id, caching the read-only result per id.
+
+    :param str rid: The resource id being parsed
+    :return: A read-only mapping with the keys described in parse_resource_id
+    :rtype: ~types.MappingProxyType
+    """
+    parts = _resource_id_parts(rid)
+    if parts is None:
+        return MappingProxyType({"name": rid})
+    result: MutableMapping[str, Union[None, str, int]] = {"subscription": parts.subscription}
+    for key, value in (
+        ("resource_group", parts.resource_group),
+        ("namespace", parts.namespace),
+        ("type", parts.type),
+        ("name", parts.name),
+        ("children", parts.remainder),
+    ):
+        if value is not None:
+            result[key] = value
+    for level, (child_namespace, child_type, child_name) in enumerate(parts.children, 1):
+        namespace_key, type_key, name_key, _ = _child_keys(level)
+        if child_namespace is not None:
+            result[namespace_key] = child_namespace
+        result[type_key] = child_type
+        result[name_key] = child_name
+    if parts.children:
+        result["last_child_num"] = len(parts.children)
+    return MappingProxyType(cast(Mapping[str, Union[str, int]], _populate_alternate_kwargs(result)))
+
+
+def _resource_id_parts(rid: str) -> Optional[_ResourceIdParts]:
+    """Split a non-empty resource id into its segments.
+
+    :param str rid: The resource id being parsed
+    :return: The segments of the id, or None if it is not a resource id
+    :rtype: _ResourceIdParts or None
+    """
+    return _scan_resource_id(rid) or _match_resource_id(rid)
+
+
+def _match_resource_id(rid: str) -> Optional[_ResourceIdParts]:
+    """Split a non-empty resource id into its segments with the regular expressions.
+
+    :param str rid: The resource id being parsed
+    :return: The segments of the id, or None if it is not a resource id
+    :rtype: _ResourceIdParts or None
+    """
+    # Ids that cannot start with "/subscriptions/{subscription}" are rejected without running the regex
+    prefix = rid[:15]
+    if prefix.isascii() and (prefix.lower() != "/subscriptions/" or rid[15:16] in ("", "/")):
+        return None
+    match = _ARMID_ROOT_RE.fullmatch(rid)
     if match:
-        result: MutableMapping[str, Union[None, str, int]] = match.groupdict()
-        children = _CHILDREN_RE.finditer(cast(Optional[str], result["children"]) or "")
-        count = None
-        for count, child in enumerate(children):
-            result.update({key + "_%d" % (count + 1): group for key, group in child.groupdict().items()})
-        result["last_child_num"] = count + 1 if isinstance(count, int) else None
-        final_result = _populate_alternate_kwargs(result)
-    else:
-        final_result = result = {"name": rid}
-    return {key: value for key, value in final_result.items() if value is not None}
+        subscription, resource_group, namespace, resource_type, name = match.group(
+            "subscription", "resource_group", "namespace", "type", "name"
+        )
+        return _ResourceIdParts(
+            subscription, resource_group, namespace, resource_type, name, None if namespace is None else ""
+        )
+    match = _ARMID_RE.match(rid)
+    if not match:
+        return None
+    subscription, resource_group, namespace, resource_type, name, remainder = match.group(
+        "subscription", "resource_group", "namespace", "type", "name", "children"
+    )
+    children: Tuple[Tuple[Optional[str], str, str], ...] = ()
+    # The root match already covers ids without children, so only scan a non-empty remainder
+    if remainder:
+        # Groups 2 to 4 of _CHILDREN_RE are child_namespace, child_type and child_name
+        children = tuple((child[2], child[3], child[4]) for child in _CHILDREN_RE.finditer(remainder))
+    return _ResourceIdParts(subscription, resource_group, namespace, resource_type, name, remainder, children)
+
+
+def _child_keys(level: int) -> Tuple[str, str, str, str]:
+    """Get the namespace, type, name and parent key names for a child level.
+
+    :param int level: The child level
+    :return: The child_namespace_{level}, child_type_{level}, child_name_{level} and child_parent_{level} keys
+    :rtype: tuple[str, str, str, str]
+    """
+    if level < len(_CHILD_KEYS):
+        return _CHILD_KEYS[level]
+    return (
+        "child_namespace_%d" % level,
+        "child_type_%d" % level,
+        "child_name_%d" % level,
+        "child_parent_%d" % level,
+    )
+
+
+def _scan_resource_id(rid: str) -> Optional[_ResourceIdParts]:
+    """Parse a well-formed resource id in a single left-to-right pass over its segments.
+
+    This only handles ids made of complete, non-empty segments, where it yields the same result
+    as matching _ARMID_RE and _CHILDREN_RE. Anything else returns None so the caller can fall
+    back to the regular expressions.
+
+    :param str rid: The resource id being parsed
+    :return: The segments of the id, or None if the id needs the regex based parser
+    :rtype: _ResourceIdParts or None
+    """
+    # Non-ASCII ids go to the regex, since re.IGNORECASE folds some non-ASCII letters (e.g. "\u017f")
+    # onto ASCII ones, and "\n" stops the "children" group of _ARMID_RE.
+    if not rid.isascii() or "\n" in rid:
+        return None
+    segments = rid.split("/")
+    length = len(segments)
+    if length < 3 or segments[0] or segments.count("") != 1 or segments[1].lower() != "subscriptions":
+        return None
+    resource_group = None
+    index = 3
+    if length > 4 and segments[3].lower() == "resourcegroups":
+        resource_group = segments[4]
+        index = 5
+    if index == length:
+        return _ResourceIdParts(segments[2], resource_group)
+    if length - index < 4 or segments[index].lower() != "providers":
+        return None
+    namespace, resource_type, name = segments[index + 1 : index + 4]
+    index += 4
+    remainder = "/" + "/".join(segments[index:]) if index < length else ""
+    children = []
+    while index < length:
+        remaining = length - index
+        child_namespace = None
+        if remaining >= 4 and segments[index].lower() == "providers":
+            child_namespace = segments[index + 1]
+            index += 2
+        elif remaining < 2:
+            return None
+        children.append((child_namespace, segments[index], segments[index + 1]))
+        index += 2
+    return _ResourceIdParts(segments[2], resource_group, namespace, resource_type, name, remainder, tuple(children))
 
 
 def _populate_alternate_kwargs(
@@ -98,19 +259,27 @@ def _populate_alternate_kwargs(
     """Translates the parsed arguments into a format used by generic ARM commands
     such as the resource and lock commands.
 
+    Parts that could not be parsed are left out rather than set to None.
+
     :param any kwargs: The parsed arguments
     :return: The translated arguments
     :rtype: any
     """
 
-    resource_namespace = kwargs["namespace"]
-    resource_type = kwargs.get("child_type_{}".format(kwargs["last_child_num"])) or kwargs["type"]
-    resource_name = kwargs.get("child_name_{}".format(kwargs["last_child_num"])) or kwargs["name"]
+    resource_namespace = kwargs.get("namespace")
+    resource_type, resource_name = kwargs.get("type"), kwargs.get("name")
+    if "last_child_num" in kwargs:
+        _, type_key, name_key, _ = _child_keys(cast(int, kwargs["last_child_num"]))
+        resource_type = kwargs.get(type_key) or resource_type
+        resource_name = kwargs.get(name_key) or resource_name
 
     _get_parents_from_parts(kwargs)
-    kwargs["resource_namespace"] = resource_namespace
-    kwargs["resource_type"] = resource_type
-    kwargs["resource_name"] = resource_name
+    if resource_namespace is not None:
+        kwargs["resource_namespace"] = resource_namespace
+    if resource_type is not None:
+        kwargs["resource_type"] = resource_type
+    if resource_name is not None:
+        kwargs["resource_name"] = resource_name
     return kwargs
 
 
@@ -121,20 +290,28 @@ def _get_parents_from_parts(kwargs: MutableMapping[str, Union[None, str, int]])
     :return: The parents
     :rtype: any
     """
-    parent_builder = []
-    if kwargs["last_child_num"] is not None:
-        parent_builder.append("{type}/{name}/".format(**kwargs))
-        for index in range(1, cast(int, kwargs["last_child_num"])):
-            child_namespace = kwargs.get("child_namespace_{}".format(index))
+    parents = ""
+    if "last_child_num" in kwargs:
+        last_child_num = cast(int, kwargs["last_child_num"])
+        # Build every parent path at once and slice each level's parent out of the full one
+        parent_builder = ["{type}/{name}/".format_map(kwargs)]
+        length = len(parent_builder[0])
+        ends = []
+        for index in range(1, last_child_num + 1):
+            namespace_key, type_key, name_key, parent_key = _child_keys(index)
+            child_namespace = kwargs.get(namespace_key)
             if child_namespace is not None:
                 parent_builder.append("providers/{}/".format(child_namespace))
-            kwargs["child_parent_{}".format(index)] = "".join(parent_builder)
-            parent_builder.append("{{child_type_{0}}}/{{child_name_{0}}}/".format(index).format(**kwargs))
-        child_namespace = kwargs.get("child_namespace_{}".format(kwargs["last_child_num"]))
-        if child_namespace is not None:
-            parent_builder.append("providers/{}/".format(child_namespace))
-        kwargs["child_parent_{}".format(kwargs["last_child_num"])] = "".join(parent_builder)
-    kwargs["resource_parent"] = "".join(parent_builder) if kwargs["name"] else None
+                length += len(parent_builder[-1])
+            ends.append((parent_key, length))
+            if index < last_child_num:
+                parent_builder.append("{}/{}/".format(kwargs[type_key], kwargs[name_key]))
+                length += len(parent_builder[-1])
+        parents = "".join(parent_builder)
+        for parent_key, end in ends:
+            kwargs[parent_key] = parents[:end]
+    if kwargs.get("name"):
+        kwargs["resource_parent"] = parents
     return kwargs
 
 
@@ -156,25 +333,33 @@ def resource_id(**kwargs: Optional[str]) -> str:  # pylint: disable=docstring-ke
     :returns: A resource id built from the given arguments.
     :rtype: str
     """
-    kwargs = {k: v for k, v in kwargs.items() if v is not None}
-    rid_builder = ["/subscriptions/{subscription}".format(**kwargs)]
-    try:
-        try:
-            rid_builder.append("resourceGroups/{resource_group}".format(**kwargs))
-        except KeyError:
-            pass
-        rid_builder.append("providers/{namespace}".format(**kwargs))
-        rid_builder.append("{type}/{name}".format(**kwargs))
-        count = 1
-        while True:
-            try:
-                rid_builder.append("providers/{{child_namespace_{}}}".format(count).format(**kwargs))
-            except KeyError:
-                pass
-            rid_builder.append("{{child_type_{0}}}/{{child_name_{0}}}".format(count).format(**kwargs))
-            count += 1
-    except KeyError:
-        pass
+    # Parts set to None count as missing; read them with .get() rather than copying kwargs without them
+    subscription = kwargs.get("subscription")
+    if subscription is None:
+        raise KeyError("subscription")
+    rid_builder = [f"/subscriptions/{subscription}"]
+    resource_group = kwargs.get("resource_group")
+    if resource_group is not None:
+        rid_builder.append(f"resourceGroups/{resource_group}")
+    namespace = kwargs.get("namespace")
+    if namespace is None:
+        return "/".join(rid_builder)
+    rid_builder.append(f"providers/{namespace}")
+    resource_type, name = kwargs.get("type"), kwargs.get("name")
+    if resource_type is None or name is None:
+        return "/".join(rid_builder)
+    rid_builder.append(f"{resource_type}/{name}")
+    count = 1
+    while True:
+        namespace_key, type_key, name_key, _ = _child_keys(count)
+        child_namespace = kwargs.get(namespace_key)
+        if child_namespace is not None:
+            rid_builder.append(f"providers/{child_namespace}")
+        child_type, child_name = kwargs.get(type_key), kwargs.get(name_key)
+        if child_type is None or child_name is None:
+            break
+        rid_builder.append(f"{child_type}/{child_name}")
+        count += 1
     return "/".join(rid_builder)
 
 
@@ -188,17 +373,40 @@ def is_valid_resource_id(rid: str, exception_type: Optional[Type[BaseException]]
     :returns: A boolean describing whether the id is valid.
     :rtype: bool
     """
-    is_valid: bool = False
-    try:
-        # Ideally, we would make a TypedDict here, but keeping this file simple for now.
-        is_valid = rid and resource_id(**parse_resource_id(rid)).lower() == rid.lower()  # type: ignore
-    except KeyError:
-        pass
+    is_valid: bool = rid and _is_valid_resource_id_cached(rid)  # type: ignore
     if not is_valid and exception_type:
         raise exception_type()
     return is_valid
 
 
+@lru_cache(maxsize=1024)
+def _is_valid_resource_id_cached(rid: str) -> bool:
+    """Validates a non-empty resource id, caching the result per id.
+
+    :param str rid: The resource id being validated.
+    :returns: A boolean describing whether the id is valid.
+    :rtype: bool
+    """
+    # The scanner only accepts ids it consumed completely in canonical form, so those are valid as they are
+    if _scan_resource_id(rid) is not None:
+        return True
+    parts = _match_resource_id(rid)
+    if parts is None:
+        return False
+    # Same as resource_id(**parse_resource_id(rid)), without going through the flat keyword form
+    rid_builder = ["/subscriptions/" + parts.subscription]
+    if parts.resource_group is not None:
+        rid_builder.append("resourceGroups/" + parts.resource_group)
+    if parts.namespace is not None:
+        rid_builder.append("providers/" + parts.namespace)
+        rid_builder.append("{}/{}".format(parts.type, parts.name))
+        for child_namespace, child_type, child_name in parts.children:
+            if child_namespace is not None:
+                rid_builder.append("providers/" + child_namespace)
+            rid_builder.append(child_type + "/" + child_name)
+    return "/".join(rid_builder).lower() == rid.lower()
+
+
 def is_valid_resource_name(rname: str, exception_type: Optional[Type[BaseException]] = None) -> bool:
     """Validates the given resource name to ARM guidelines, individual services may be more restrictive.
 
@@ -210,9 +418,7 @@ def is_valid_resource_name(rname: str, exception_type: Optional[Type[BaseExcepti
     :rtype: bool
     """
 
-    match = _ARMNAME_RE.match(rname)
-
-    if match:
+    if 0 < len(rname) <= 260 and _ARMNAME_FORBIDDEN.isdisjoint(rname):
         return True
     if exception_type:
         raise exception_type()
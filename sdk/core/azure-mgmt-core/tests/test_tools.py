@@ -341,6 +341,28 @@ class TestTools(unittest.TestCase):
             rsrc_id = resource_id(**test["id_args"])
             self.assertEqual(rsrc_id.lower(), test["resource_id"].lower())
 
+    def test_resource_parse_irregular(self):
+        kwargs = parse_resource_id("/subscriptions/fakesub/providers/Microsoft.Authorization//foo")
+        self.assertEqual(kwargs["type"], "")
+        self.assertEqual(kwargs["name"], "foo")
+
+        kwargs = parse_resource_id("/subscriptions/fakesub/resourceGroups/myRg/providers/namespace/type/name/type1")
+        self.assertEqual(kwargs["resource_name"], "name")
+        self.assertNotIn("child_type_1", kwargs)
+
+        kwargs = parse_resource_id("/subscriptions/fakesub/resourceGroups/myRg/type1/name1")
+        self.assertEqual(kwargs, {"subscription": "fakesub", "resource_group": "myRg"})
+
+    def test_resource_parse_cached(self):
+        rid = "/subscriptions/fakesub/resourceGroups/myRg/providers/Microsoft.Storage/storageAccounts/foo"
+        kwargs = parse_resource_id(rid)
+        kwargs["name"] = "bar"
+        self.assertEqual(parse_resource_id(rid)["name"], "foo")
+        self.assertTrue(is_valid_resource_id(rid))
+        self.assertTrue(is_valid_resource_id(rid))
+        with self.assertRaises(ValueError):
+            is_valid_resource_id(rid + "/type1", ValueError)
+
     def test_is_resource_name(self):
         invalid_names = [
             "",
@@ -356,6 +378,7 @@ class TestTools(unittest.TestCase):
         valid_names = [
             "abc-123",
             " ",  # no one said it had to be a good resource name.
+            "back\\slash",
             "a" * 260,
         ]
 
@@ -47,9 +47,11 @@ async def main():
 
     async with producer_client:
         event_data_batch = await producer_client.create_batch(max_size_in_bytes=10000)
+        # Every message in the batch has the same payload, so a single EventData is created and added repeatedly.
+        event_data = EventData('Message inside EventBatchData')
         while True:
             try:
-                event_data_batch.add(EventData('Message inside EventBatchData'))
+                event_data_batch.add(event_data)
             except ValueError:
                 # EventDataBatch object reaches max_size.
                 # New EventDataBatch object can be created here to send more data.